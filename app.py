@@ -1,11 +1,23 @@
 """Flask web application for truck loading optimization."""
 
-from flask import Flask, render_template, request, jsonify
+import os
+
+import orjson
+from flask import Flask, render_template, request
 from packing import pack_boxes_with_stacking
 
 app = Flask(__name__)
 
 
+def _json(obj, status: int = 200):
+    """JSON response serialised with orjson (much faster than jsonify)."""
+    # Custom-box ids key custom_counts and may arrive as numbers; keys are
+    # sorted as jsonify did
+    body = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS
+                                    | orjson.OPT_SORT_KEYS)
+    return app.response_class(body, status=status, mimetype="application/json")
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
@@ -22,10 +34,15 @@ def optimize():
             european_non_stackable=int(data.get("european_non_stackable", 0)),
             custom_boxes=data.get("custom_boxes"),
         )
-        return jsonify(result)
+        return _json(result)
     except Exception as e:
-        return jsonify({"error": str(e)}), 400
+        return _json({"error": str(e)}, 400)
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    # FLASK_DEBUG=1 runs the reloading Werkzeug dev server instead
+    if os.environ.get("FLASK_DEBUG") == "1":
+        app.run(debug=True, port=5000)
+    else:
+        from waitress import serve
+        serve(app, host="127.0.0.1", port=5000, threads=8)
@@ -24,7 +24,7 @@ echo.
 
 :: ── Install / upgrade dependencies ──────────────────────────────────────
 echo  [1/3] Installing dependencies...
-python -m pip install --upgrade --quiet flask pyinstaller
+python -m pip install --upgrade --quiet flask orjson waitress pyinstaller
 if errorlevel 1 (
     echo  [ERROR] pip install failed.
     pause
@@ -51,6 +51,8 @@ python -m PyInstaller ^
     --add-data "static;static" ^
     --hidden-import=packing ^
     --hidden-import=flask ^
+    --hidden-import=orjson ^
+    --hidden-import=waitress ^
     --hidden-import=werkzeug ^
     --hidden-import=jinja2 ^
     --hidden-import=click ^
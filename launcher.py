@@ -45,7 +45,8 @@ def _patched_init(self, import_name, **kwargs):
 _Flask.__init__ = _patched_init
 
 # ── Import the Flask application ──────────────────────────────────────────
-from app import app  # noqa: E402  (app.py must not be modified)
+from app import app  # noqa: E402
+from waitress import serve  # noqa: E402
 
 
 # ── Find a free port ──────────────────────────────────────────────────────
@@ -71,11 +72,11 @@ if __name__ == "__main__":
     print("   Close this window to stop the server.")
     print("=" * 52)
 
-    # Open the browser slightly after Flask is ready
+    # Open the browser slightly after the server is ready
     def _open_browser():
         time.sleep(1.5)
         webbrowser.open(URL)
 
     threading.Thread(target=_open_browser, daemon=True).start()
 
-    app.run(host="127.0.0.1", port=PORT, debug=False, use_reloader=False)
+    serve(app, host="127.0.0.1", port=PORT, threads=8)
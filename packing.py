@@ -25,14 +25,43 @@ Row types that fill 2.4m width with zero waste:
   D — 1 American + 1 European (1.2w each) → row depth 1.0m, 1 AM + 1 EU
 """
 
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain
 
 TRUCK_WIDTH  = 2.4
 TRUCK_LENGTH = 13.2
 EPS = 1e-6
 
-
-@dataclass
+# Box slots of each row type, left to right: (box_type, x, w, h) in metres.
+# "pA" / "pB" are partial rows holding a single odd box.
+_ROW_LAYOUTS = {
+    "A":  (("american", 0.0, 1.2, 1.0), ("american", 1.2, 1.2, 1.0)),
+    "B":  (("european", 0.0, 1.2, 0.8), ("european", 1.2, 1.2, 0.8)),
+    "C":  (("european", 0.0, 0.8, 1.2), ("european", 0.8, 0.8, 1.2),
+           ("european", 1.6, 0.8, 1.2)),
+    "D":  (("american", 0.0, 1.2, 1.0), ("european", 1.2, 1.2, 0.8)),
+    "pA": (("american", 0.0, 1.2, 1.0),),
+    "pB": (("european", 0.0, 1.2, 0.8),),
+}
+
+# Standard boxes are multiples of 0.1m, so their search and row layout run on
+# integer tenths of a metre and convert to metres only when placing boxes.
+LEN10 = 132
+ROW_DEPTH10 = {name: round(max(slot[3] for slot in slots) * 10)
+               for name, slots in _ROW_LAYOUTS.items()}
+
+_TRUCK_AREA = TRUCK_WIDTH * TRUCK_LENGTH
+
+# Most boxes of one type the floor can hold: two American per 1.0m row;
+# European boxes cost at least 0.4m each, three to a C row (one sharing a
+# D row costs a whole 1.0m row, so never allows more).
+_MAX_AM_FLOOR = 2 * (LEN10 // ROW_DEPTH10["A"])
+_MAX_EU_FLOOR = LEN10 // (ROW_DEPTH10["C"] // 3)
+
+
+@dataclass(slots=True)
 class PlacedBox:
     x: float          # position along truck width
     y: float          # position along truck length
@@ -52,6 +81,10 @@ def _box_to_dict(b: PlacedBox) -> dict:
     }
 
 
+def _box_to_tuple(b: PlacedBox) -> tuple:
+    return (b.x, b.y, b.w, b.h, b.box_type, b.stackable, b.stacked)
+
+
 # ── Helpers ──────────────────────────────────────────────────────────
 
 def _max_stackable_bonus(floor_spots: int, s_count: int, ns_count: int) -> int:
@@ -73,97 +106,106 @@ def _max_stackable_bonus(floor_spots: int, s_count: int, ns_count: int) -> int:
     return stacked_on_top
 
 
-def _greedy_fill(am_left: int, eu_left: int, remaining_len: float) -> list:
-    """Greedily fill remaining truck space with best-fit rows."""
-    rows = []
-    candidates = [
-        ("A",  2, 0, 1.0),
-        ("C",  0, 3, 1.2),
-        ("B",  0, 2, 0.8),
-        ("D",  1, 1, 1.0),
-        ("pA", 1, 0, 1.0),
-        ("pE2",0, 2, 1.2),
-        ("pB", 0, 1, 0.8),
-    ]
-    changed = True
-    while changed and remaining_len > EPS and (am_left > 0 or eu_left > 0):
-        changed = False
-        for name, an, en, h in candidates:
-            if an <= am_left and en <= eu_left and h <= remaining_len + EPS:
-                rows.append((name, an, en, h))
-                am_left -= an
-                eu_left -= en
-                remaining_len -= h
-                changed = True
-                break
-    return rows
+def _european_rows(n: int) -> tuple[int, int, int]:
+    """
+    Split `n` European boxes into (C rows, B rows, partial pB rows).
+
+    C and B rows both cost 0.4m of length per box, so any split is equally
+    short; the one with the most C rows uses the fewest rows.  A single
+    leftover box needs a partial row.
+    """
+    if n == 1:
+        return 0, 0, 1
+    c = n // 3
+    if (n - 3 * c) % 2:
+        c -= 1
+    return c, (n - 3 * c) // 2, 0
 
 
 # ── Row-configuration search ──────────────────────────────────────────
 
 def _find_best_row_config(total_am: int, total_eu: int,
                           am_s: int, am_ns: int,
-                          eu_s: int, eu_ns: int) -> tuple:
+                          eu_s: int, eu_ns: int,
+                          shortest: bool = False) -> tuple:
     """
     Search for the combination of row types A/B/C/D that maximises
     TOTAL boxes loaded (floor + legally stacked) within the 13.2m length.
-    """
-    best      = None
-    best_score = (-1, 0, 0)
-
-    max_a = min(total_am // 2,  int(TRUCK_LENGTH / 1.0 + EPS))
-    max_c = min(total_eu // 3,  int(TRUCK_LENGTH / 1.2 + EPS))
 
-    for a in range(max_a + 1):
-        len_a = a * 1.0
-        if len_a > TRUCK_LENGTH + EPS:
+    For a given floor count of each type the shortest layout with the fewest
+    rows is known in closed form: American boxes go two per A row, an odd
+    one shares a D row with a European box (or sits alone in a pA row), and
+    the remaining European boxes are split by `_european_rows`.  Working in
+    tenths of a metre, only the (american, european) floor counts are
+    enumerated; the European layouts and stacking bonuses are tabulated once
+    per call.
+
+    Among layouts loading the same number of boxes, more boxes on the floor
+    win (stacking is only for what does not fit), then fewer rows, then a
+    shorter load.  With `shortest` set, because custom boxes still need the
+    length left behind the standard rows, the shortest load wins first,
+    then more floor boxes, then fewer rows.
+    """
+    eu_cap     = min(total_eu, _MAX_EU_FLOOR)
+    eu_layouts = [_european_rows(n) for n in range(eu_cap + 1)]
+    eu_lengths = [ROW_DEPTH10["C"] * c + ROW_DEPTH10["B"] * b + ROW_DEPTH10["pB"] * pb
+                  for c, b, pb in eu_layouts]
+    eu_rows    = [sum(layout) for layout in eu_layouts]
+    eu_bonus   = [_max_stackable_bonus(eu, eu_s, eu_ns) for eu in range(eu_cap + 1)]
+    eu_totals  = [eu + bonus for eu, bonus in enumerate(eu_bonus)]
+
+    def eu_length(eu: int, odd: int) -> int:
+        # An odd American box shares its D row with the first European box
+        return eu_lengths[eu - odd] if eu else 0
+
+    best       = None
+    best_score = (-1, 0, 0, 0)
+
+    for am in range(min(total_am, _MAX_AM_FLOOR) + 1):
+        a, odd = divmod(am, 2)
+        len_am = ROW_DEPTH10["A"] * a + ROW_DEPTH10["D"] * odd
+        if len_am > LEN10:
             break
+        stacked_am = _max_stackable_bonus(am, am_s, am_ns)
 
-        for c in range(max_c + 1):
-            len_ac = len_a + c * 1.2
-            if len_ac > TRUCK_LENGTH + EPS:
-                break
-            eu_after_c = total_eu - 3 * c
-            if eu_after_c < 0:
-                break
-
-            am_after_a  = total_am - 2 * a
-            rem_len      = TRUCK_LENGTH - len_ac
-            max_d        = min(am_after_a, eu_after_c, int(rem_len / 1.0 + EPS))
-
-            for d in range(max_d + 1):
-                am_left = am_after_a - d
-                eu_left = eu_after_c - d
-                rem      = rem_len - d * 1.0
-
-                b        = min(eu_left // 2, int(rem / 0.8 + EPS))
-                used_len = len_ac + d * 1.0 + b * 0.8
-                leftover = TRUCK_LENGTH - used_len
-                eu_rem   = eu_left - 2 * b
-
-                extra_rows = _greedy_fill(am_left, eu_rem, leftover)
-                extra_am   = sum(r[1] for r in extra_rows)
-                extra_eu   = sum(r[2] for r in extra_rows)
-                extra_len  = sum(r[3] for r in extra_rows)
-
-                floor_am = 2 * a + d + extra_am
-                floor_eu = 3 * c + d + 2 * b + extra_eu
-
-                # Actual placed on floor (capped by available boxes)
-                placed_am_floor = min(floor_am, total_am)
-                placed_eu_floor = min(floor_eu, total_eu)
-
-                stacked_am = _max_stackable_bonus(placed_am_floor, am_s, am_ns)
-                stacked_eu = _max_stackable_bonus(placed_eu_floor, eu_s, eu_ns)
+        # Bound: even with every European box loaded this count cannot win
+        if am + stacked_am + total_eu < best_score[0]:
+            continue
 
-                total_with_stacking = placed_am_floor + placed_eu_floor + stacked_am + stacked_eu
-                total_len  = used_len + extra_len
-                num_rows   = a + b + c + d + len(extra_rows)
+        # Each extra European floor box never lowers the loaded total and
+        # never shortens the load, but always adds a floor box.  So a single
+        # European count can win for this American count: the most that fit,
+        # or with `shortest` the fewest reaching that same total, carried on
+        # while the load length stays the same.  Both lengths and totals only
+        # grow with the European count, so both ends are found by bisection.
+        eu_max = min(bisect_right(eu_lengths, LEN10 - len_am) - 1 + odd, eu_cap)
+        total_with_stacking = am + stacked_am + eu_totals[eu_max]
+        if total_with_stacking < best_score[0]:
+            continue
 
-                score = (total_with_stacking, -num_rows, -total_len)
-                if score > best_score:
-                    best_score = score
-                    best = (a, b, c, d, extra_rows)
+        eu = eu_max
+        if shortest:
+            eu = bisect_left(eu_totals, eu_totals[eu_max], 0, eu_max)
+            while eu < eu_max and eu_length(eu + 1, odd) == eu_length(eu, odd):
+                eu += 1
+
+        d = odd if eu else 0
+        total_len = len_am + eu_lengths[eu - d]
+        num_rows = a + odd + eu_rows[eu - d]
+
+        if shortest:
+            score = (total_with_stacking, -total_len, am + eu, -num_rows)
+        else:
+            score = (total_with_stacking, am + eu, -num_rows, -total_len)
+        if score > best_score:
+            best_score = score
+            c, b, pb = eu_layouts[eu - d]
+            extra_rows = []
+            if odd and not d:
+                extra_rows.append(("pA", 1, 0, ROW_DEPTH10["pA"]))
+            if pb:
+                extra_rows.append(("pB", 0, 1, ROW_DEPTH10["pB"]))
+            best = (a, b, c, d, extra_rows)
 
     return best if best is not None else (0, 0, 0, 0, [])
 
@@ -171,10 +213,13 @@ def _find_best_row_config(total_am: int, total_eu: int,
 # ── Coordinate generation ─────────────────────────────────────────────
 
 def _generate_placements(a, b, c, d, extra_rows,
-                         am_s, am_ns, eu_s, eu_ns) -> list[PlacedBox]:
+                         am_s, am_ns, eu_s, eu_ns) -> tuple[list[PlacedBox], int, int]:
     """
     Convert a row configuration into concrete PlacedBox objects.
 
+    Returns (placed, floor_am_total, floor_eu_total): the floor boxes and
+    how many of them are American / European.
+
     Floor-assignment priority:
       Non-stackable boxes fill floor spots first.
       Remaining spots go to stackable boxes (so surplus stackable can be stacked).
@@ -198,94 +243,56 @@ def _generate_placements(a, b, c, d, extra_rows,
     eu_ns_floor = min(eu_ns, floor_eu)
     eu_s_floor  = floor_eu - eu_ns_floor
 
-    # Queues: non-stackable (False) first, then stackable (True)
-    am_queue = [False] * am_ns_floor + [True] * am_s_floor
-    eu_queue = [False] * eu_ns_floor + [True] * eu_s_floor
-
-    am_idx = 0
-    eu_idx = 0
+    # Boxes still to hand out: non-stackable (False) first, then stackable (True)
+    am_ns_rem, am_s_rem = am_ns_floor, am_s_floor
+    eu_ns_rem, eu_s_rem = eu_ns_floor, eu_s_floor
 
     placed: list[PlacedBox] = []
-    y = 0.0
+    y = 0  # tenths of a metre
 
     def next_am() -> bool:
-        nonlocal am_idx
-        if am_idx >= len(am_queue):
+        nonlocal am_ns_rem, am_s_rem
+        if am_ns_rem:
+            am_ns_rem -= 1
             return False
-        v = am_queue[am_idx]; am_idx += 1; return v
+        if am_s_rem:
+            am_s_rem -= 1
+            return True
+        return False
 
     def next_eu() -> bool:
-        nonlocal eu_idx
-        if eu_idx >= len(eu_queue):
+        nonlocal eu_ns_rem, eu_s_rem
+        if eu_ns_rem:
+            eu_ns_rem -= 1
             return False
-        v = eu_queue[eu_idx]; eu_idx += 1; return v
-
-    def add(x, yy, w, h, btype, stackable_fn):
-        placed.append(PlacedBox(x, yy, w, h, btype, stackable_fn()))
-
-    # ── Row type A: 2 American (1.2w × 1.0h) ──
-    for _ in range(a):
-        add(0.0, y, 1.2, 1.0, "american", next_am)
-        add(1.2, y, 1.2, 1.0, "american", next_am)
-        y += 1.0
-
-    # ── Row type D: 1 American + 1 European ──
-    for _ in range(d):
-        add(0.0, y, 1.2, 1.0, "american", next_am)
-        add(1.2, y, 1.2, 0.8, "european", next_eu)
-        y += 1.0
-
-    # ── Row type C: 3 European (0.8w × 1.2h) ──
-    for _ in range(c):
-        add(0.0, y, 0.8, 1.2, "european", next_eu)
-        add(0.8, y, 0.8, 1.2, "european", next_eu)
-        add(1.6, y, 0.8, 1.2, "european", next_eu)
-        y += 1.2
-
-    # ── Row type B: 2 European (1.2w × 0.8h) ──
-    for _ in range(b):
-        add(0.0, y, 1.2, 0.8, "european", next_eu)
-        add(1.2, y, 1.2, 0.8, "european", next_eu)
-        y += 0.8
-
-    # ── Extra rows from greedy fill ──
-    for row_name, am_need, eu_need, height in extra_rows:
-        _place_extra_row(placed, row_name, y,
-                         next_am if am_need else None,
-                         next_eu if eu_need else None)
-        y += height
-
-    return placed
-
-
-def _place_extra_row(placed, row_name, y, next_am_fn, next_eu_fn):
-    def am(): return next_am_fn()
-    def eu(): return next_eu_fn()
-
-    def add(x, w, h, btype, sfn):
-        placed.append(PlacedBox(x, y, w, h, btype, sfn()))
-
-    if   row_name == "A":
-        add(0.0, 1.2, 1.0, "american", am); add(1.2, 1.2, 1.0, "american", am)
-    elif row_name == "B":
-        add(0.0, 1.2, 0.8, "european", eu); add(1.2, 1.2, 0.8, "european", eu)
-    elif row_name == "C":
-        add(0.0, 0.8, 1.2, "european", eu)
-        add(0.8, 0.8, 1.2, "european", eu)
-        add(1.6, 0.8, 1.2, "european", eu)
-    elif row_name == "D":
-        add(0.0, 1.2, 1.0, "american", am); add(1.2, 1.2, 0.8, "european", eu)
-    elif row_name == "pA":
-        add(0.0, 1.2, 1.0, "american", am)
-    elif row_name == "pB":
-        add(0.0, 1.2, 0.8, "european", eu)
-    elif row_name == "pE2":
-        add(0.0, 0.8, 1.2, "european", eu); add(0.8, 0.8, 1.2, "european", eu)
+        if eu_s_rem:
+            eu_s_rem -= 1
+            return True
+        return False
+
+    # Full rows in fixed order, then the partial rows
+    for row_name, count in (("A", a), ("D", d), ("C", c), ("B", b)):
+        for _ in range(count):
+            _place_row(placed, row_name, y / 10, next_am, next_eu)
+            y += ROW_DEPTH10[row_name]
+
+    for row_name, _, _, depth in extra_rows:
+        _place_row(placed, row_name, y / 10, next_am, next_eu)
+        y += depth
+
+    return placed, floor_am, floor_eu
+
+
+def _place_row(placed, row_name, y, next_am_fn, next_eu_fn):
+    for btype, x, w, h in _ROW_LAYOUTS[row_name]:
+        stackable = next_am_fn() if btype == "american" else next_eu_fn()
+        placed.append(PlacedBox(x, y, w, h, btype, stackable))
 
 
 # ── Stacking ──────────────────────────────────────────────────────────
 
 def _apply_stacking(floor_placed: list[PlacedBox],
+                    floor_am_total: int, floor_eu_total: int,
                     am_s: int, am_ns: int,
                     eu_s: int, eu_ns: int) -> tuple[list[PlacedBox], int]:
     """
@@ -297,12 +304,15 @@ def _apply_stacking(floor_placed: list[PlacedBox],
       - Non-stackable boxes are NEVER involved (neither base nor top).
       - One extra box per base, same type only.
     """
-    # Count stackable floor boxes per type
-    floor_am_s_bases = [p for p in floor_placed if p.box_type == "american" and p.stackable]
-    floor_eu_s_bases = [p for p in floor_placed if p.box_type == "european" and p.stackable]
-
-    floor_am_total = sum(1 for p in floor_placed if p.box_type == "american")
-    floor_eu_total = sum(1 for p in floor_placed if p.box_type == "european")
+    # Collect stackable bases per type in one pass
+    floor_am_s_bases: list[PlacedBox] = []
+    floor_eu_s_bases: list[PlacedBox] = []
+    for p in floor_placed:
+        if p.stackable:
+            if p.box_type == "american":
+                floor_am_s_bases.append(p)
+            elif p.box_type == "european":
+                floor_eu_s_bases.append(p)
 
     # Stackable boxes that ended up on the floor (filled remaining spots after ns)
     am_ns_on_floor = min(am_ns, floor_am_total)
@@ -340,12 +350,46 @@ def _apply_stacking(floor_placed: list[PlacedBox],
     return stacked, not_placed
 
 
+# ── Cached standard packing ───────────────────────────────────────────
+
+@lru_cache(maxsize=4096)
+def _solve_standard(am_s: int, am_ns: int, eu_s: int, eu_ns: int,
+                    shortest: bool) -> tuple:
+    """
+    Pack the standard American/European boxes.  The result depends only on
+    the four counts and `shortest` (see `_find_best_row_config`), so it is
+    memoised; placements are returned as immutable tuples of PlacedBox
+    fields and must be rebuilt into objects per call.
+
+    Returns (a, b, c, d, extra_rows, floor_tuple, stacked_tuple, not_placed).
+    """
+    a, b, c, d, extra_rows = _find_best_row_config(
+        am_s + am_ns, eu_s + eu_ns, am_s, am_ns, eu_s, eu_ns, shortest
+    )
+
+    floor_placed, floor_am, floor_eu = _generate_placements(
+        a, b, c, d, extra_rows,
+        am_s, am_ns, eu_s, eu_ns,
+    )
+
+    stacked, not_placed = _apply_stacking(
+        floor_placed, floor_am, floor_eu, am_s, am_ns, eu_s, eu_ns
+    )
+
+    return (a, b, c, d, tuple(extra_rows),
+            tuple(_box_to_tuple(p) for p in floor_placed),
+            tuple(_box_to_tuple(p) for p in stacked),
+            not_placed)
+
+
 # ── Custom-box shelf packing ─────────────────────────────────────────
 
-def _pack_custom_boxes(custom_types: list, remaining_length: float) -> tuple:
+def _pack_custom_boxes(custom_types: list, remaining_length: float,
+                       y_offset: float = 0.0) -> tuple:
     """
     Pack arbitrary-dimension custom boxes into the remaining truck space
-    using a greedy shelf (strip) algorithm.
+    using a greedy shelf (strip) algorithm.  The free space starts at
+    `y_offset` along the truck; boxes are placed at their final position.
 
     Each custom type dict: {id, name, width, length, stackable, non_stackable}
 
@@ -356,7 +400,8 @@ def _pack_custom_boxes(custom_types: list, remaining_length: float) -> tuple:
     counts: dict = {}
 
     # Build a flat list of boxes to place, non-stackable first (they must go on floor)
-    floor_boxes = []
+    ns_list = []
+    s_list = []
     for ct in custom_types:
         tid = ct["id"]
         ns = max(0, int(ct.get("non_stackable", 0)))
@@ -365,56 +410,64 @@ def _pack_custom_boxes(custom_types: list, remaining_length: float) -> tuple:
         bl = float(ct["length"])
         counts[tid] = {"floor": 0, "stacked": 0, "requested": ns + s,
                         "name": ct["name"], "width": bw, "length": bl}
-        # Non-stackable boxes first (they can only go on floor)
         for _ in range(ns):
-            floor_boxes.append((tid, bw, bl, False))
+            ns_list.append((tid, bw, bl, False))
         for _ in range(s):
-            floor_boxes.append((tid, bw, bl, True))
+            s_list.append((tid, bw, bl, True))
+
+    # Decreasing size within each group (first-fit decreasing) wastes less
+    # shelf depth; non-stackable boxes still come first.
+    def _size_key(box):
+        return (-max(box[1], box[2]), -min(box[1], box[2]))
+
+    ns_list.sort(key=_size_key)
+    s_list.sort(key=_size_key)
+    floor_boxes = ns_list + s_list
 
     if not floor_boxes:
         return placed, counts
 
     # Greedy shelf packing into remaining_length x TRUCK_WIDTH area
     # Each shelf has a fixed height (depth along truck) = tallest box in that shelf
-    shelves = []  # list of (y_start, shelf_height, boxes_in_shelf)
+    shelves = []  # list of [y_start (absolute), shelf_height, x_cursor]
     y_cursor = 0.0
 
     for tid, bw, bl, stackable in floor_boxes:
-        # Try both orientations
-        orientations = [(bw, bl), (bl, bw)]
-        fitted = False
-
-        for ow, oh in orientations:
-            if ow > TRUCK_WIDTH + EPS or oh > remaining_length + EPS:
-                continue
-
-            # Try to fit in an existing shelf
-            for shelf in shelves:
-                sy, sh, sboxes = shelf
-                if oh > sh + EPS:
+        # Both orientations, longer side across the truck first: a new shelf
+        # opened with it is as shallow as possible.
+        orientations = [(max(bw, bl), min(bw, bl)), (min(bw, bl), max(bw, bl))]
+        orientations = [(ow, oh) for ow, oh in orientations
+                        if ow <= TRUCK_WIDTH + EPS and oh <= remaining_length + EPS]
+
+        # Best fit over every shelf and orientation: the placement that
+        # leaves the least unused depth above the box
+        best = None
+        best_waste = None
+        for shelf in shelves:
+            sy, sh, x_cursor = shelf
+            for ow, oh in orientations:
+                if oh > sh + EPS or x_cursor + ow > TRUCK_WIDTH + EPS:
                     continue
-                # Find rightmost edge in this shelf
-                x_cursor = sum(sb[1] for sb in sboxes)
-                if x_cursor + ow <= TRUCK_WIDTH + EPS:
-                    sboxes.append((tid, ow, oh, stackable))
-                    p = PlacedBox(x_cursor, sy, ow, oh, tid, stackable)
-                    placed.append(p)
-                    counts[tid]["floor"] += 1
-                    fitted = True
-                    break
-
-            if fitted:
-                break
+                waste = sh - oh
+                if best_waste is None or waste < best_waste:
+                    best = (shelf, ow, oh)
+                    best_waste = waste
+
+        if best is not None:
+            shelf, ow, oh = best
+            sy, _, x_cursor = shelf
+            shelf[2] += ow
+            placed.append(PlacedBox(x_cursor, sy, ow, oh, tid, stackable))
+            counts[tid]["floor"] += 1
+            continue
 
-            # Open a new shelf
+        # Open a new shelf
+        for ow, oh in orientations:
             if y_cursor + oh <= remaining_length + EPS:
-                shelf_entry = (y_cursor, oh, [(tid, ow, oh, stackable)])
-                shelves.append(shelf_entry)
-                p = PlacedBox(0.0, y_cursor, ow, oh, tid, stackable)
-                placed.append(p)
+                shelves.append([y_offset + y_cursor, oh, ow])
+                placed.append(PlacedBox(0.0, y_offset + y_cursor, ow, oh, tid, stackable))
                 counts[tid]["floor"] += 1
                 y_cursor += oh
-                fitted = True
                 break
 
         # If not fitted, box is unplaced (counts will show the gap)
@@ -486,43 +539,46 @@ def pack_boxes_with_stacking(american_stackable: int,
     floor_placed: list[PlacedBox] = []
     stacked: list[PlacedBox] = []
     not_placed_std = 0
-    used_length = 0.0
+    used_len10 = 0
 
     if total_am + total_eu > 0:
-        a, b, c, d, extra_rows = _find_best_row_config(
-            total_am, total_eu, am_s, am_ns, eu_s, eu_ns
-        )
-
-        floor_placed = _generate_placements(
-            a, b, c, d, extra_rows,
-            am_s, am_ns, eu_s, eu_ns,
+        # Leave as much length as possible when custom boxes follow
+        (a, b, c, d, extra_rows,
+         floor_rows, stacked_rows, not_placed_std) = _solve_standard(
+            am_s, am_ns, eu_s, eu_ns, total_custom_requested > 0
         )
 
-        stacked, not_placed_std = _apply_stacking(
-            floor_placed, am_s, am_ns, eu_s, eu_ns
-        )
+        floor_placed = [PlacedBox(*t) for t in floor_rows]
+        stacked = [PlacedBox(*t) for t in stacked_rows]
 
-        # Calculate used truck length from standard boxes
-        if floor_placed:
-            used_length = max(p.y + p.h for p in floor_placed)
+        # Used truck length is the sum of the chosen row depths
+        used_len10 = (ROW_DEPTH10["A"] * a + ROW_DEPTH10["B"] * b
+                      + ROW_DEPTH10["C"] * c + ROW_DEPTH10["D"] * d
+                      + sum(r[3] for r in extra_rows))
 
     # ── Custom box packing ────────────────────────────────────────
     custom_placed: list[PlacedBox] = []
     custom_counts: dict = {}
 
     if custom_types:
-        remaining = TRUCK_LENGTH - used_length
-        custom_placed, custom_counts = _pack_custom_boxes(custom_types, remaining)
-        # Offset custom boxes by used_length
-        for p in custom_placed:
-            p.y += used_length
+        remaining = (LEN10 - used_len10) / 10
+        custom_placed, custom_counts = _pack_custom_boxes(
+            custom_types, remaining, y_offset=used_len10 / 10
+        )
 
     # ── Combine results ───────────────────────────────────────────
-    all_floor = floor_placed + [p for p in custom_placed if not p.stacked]
-    all_stacked = stacked + [p for p in custom_placed if p.stacked]
-
-    all_placed_dicts = [_box_to_dict(p) for p in all_floor] + [_box_to_dict(p) for p in all_stacked]
-    floor_area = sum(p.w * p.h for p in all_floor)
+    # One pass: floor boxes first, then stacked, standard before custom
+    floor_dicts: list[dict] = []
+    stacked_dicts: list[dict] = []
+    floor_area = 0.0
+    for p in chain(floor_placed, stacked, custom_placed):
+        if p.stacked:
+            stacked_dicts.append(_box_to_dict(p))
+        else:
+            floor_dicts.append(_box_to_dict(p))
+            floor_area += p.w * p.h
+    floor_count = len(floor_dicts)
+    stacked_count = len(stacked_dicts)
 
     custom_not_placed = sum(
         max(0, info["requested"] - info["floor"] - info["stacked"])
@@ -533,14 +589,14 @@ def pack_boxes_with_stacking(american_stackable: int,
     total_requested = total_am + total_eu + total_custom_requested
 
     return {
-        "placed":          all_placed_dicts,
-        "floor_count":     len(all_floor),
-        "stacked_count":   len(all_stacked),
-        "total_placed":    len(all_floor) + len(all_stacked),
+        "placed":          floor_dicts + stacked_dicts,
+        "floor_count":     floor_count,
+        "stacked_count":   stacked_count,
+        "total_placed":    floor_count + stacked_count,
         "not_placed":      total_not_placed,
         "total_requested": total_requested,
         "truck_width":     TRUCK_WIDTH,
         "truck_length":    TRUCK_LENGTH,
-        "utilization":     round(floor_area / (TRUCK_WIDTH * TRUCK_LENGTH) * 100, 1),
-        "custom_counts":   {k: {kk: vv for kk, vv in v.items()} for k, v in custom_counts.items()},
+        "utilization":     round(floor_area / _TRUCK_AREA * 100, 1),
+        "custom_counts":   custom_counts,
     }
\ No newline at end of file
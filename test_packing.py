@@ -0,0 +1,41 @@
+"""Regression tests for the standard-box row search in packing.py."""
+
+import pytest
+
+from packing import pack_boxes_with_stacking
+
+
+# (am_s, am_ns, eu_s, eu_ns) -> (floor_count, stacked_count, not_placed, utilization)
+# Values match or beat the original exhaustive search: boxes are stacked only
+# once the floor is full.
+@pytest.mark.parametrize("counts, expected", [
+    ((4, 0, 0, 0),      (4, 0, 0, 15.2)),
+    ((0, 0, 6, 0),      (6, 0, 0, 18.2)),
+    ((3, 2, 5, 1),      (11, 0, 0, 37.1)),
+    ((13, 0, 13, 0),    (26, 0, 0, 88.6)),
+    ((20, 0, 20, 0),    (30, 10, 0, 98.5)),
+    ((0, 5, 0, 40),     (33, 0, 12, 100.0)),
+    ((30, 30, 30, 30),  (33, 3, 84, 100.0)),
+])
+def test_floor_filled_before_stacking(counts, expected):
+    r = pack_boxes_with_stacking(*counts)
+    assert (r["floor_count"], r["stacked_count"],
+            r["not_placed"], r["utilization"]) == expected
+
+
+def test_no_stacking_while_floor_has_room():
+    # Every American box fits on the floor up to 26 (13 A rows)
+    for n in range(27):
+        r = pack_boxes_with_stacking(n, 0, 0, 0)
+        assert r["floor_count"] == n
+        assert r["stacked_count"] == 0
+
+
+def test_standard_rows_leave_room_for_custom_boxes():
+    # Shortest standard layout first: the original solver ended at 12.8m and
+    # fitted 2 of the 3 custom boxes; filling the floor to 13.2m fits none.
+    custom = [{"id": "k", "name": "k", "width": 1.2, "length": 0.4,
+               "stackable": 0, "non_stackable": 3}]
+    r = pack_boxes_with_stacking(0, 11, 8, 14, custom_boxes=custom)
+    assert r["total_placed"] == 35
+    assert r["custom_counts"]["k"]["floor"] == 2